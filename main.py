@@ -1,43 +1,462 @@
-from flask import Flask, request, jsonify, render_template_string
-import uuid
+from flask import Flask, Response, redirect, request, send_from_directory
+from markupsafe import Markup, escape
+import secrets
 import os
 import json
-from datetime import datetime
+import sqlite3
+import sys
+import threading
+import time
+import orjson
+from datetime import datetime, timezone
+from collections import OrderedDict
+from functools import lru_cache
 
 app = Flask(__name__)
 
-# Directory to store pastes
-PASTES_DIR = "pastes"
+# Largest paste accepted; Werkzeug rejects bigger request bodies before reading them
+MAX_PASTE_SIZE = 1 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_PASTE_SIZE
+
+# Let a front-end server that understands X-Sendfile send raw pastes from
+# disk; opt-in, since without one the response body would be empty
+app.config['USE_X_SENDFILE'] = os.environ.get("USE_X_SENDFILE") == "1"
+
+# Public URL of the deployment used in paste links; without it links are
+# built from the client-supplied Host header of each request
+app.config['BASE_URL'] = os.environ.get("BASE_URL", "").rstrip('/')
+
+# Directory to store pastes (absolute, since send_from_directory resolves
+# relative paths against the app root rather than the working directory)
+PASTES_DIR = os.path.abspath("pastes")
 os.makedirs(PASTES_DIR, exist_ok=True)
 
+# SQLite database holding the paste records
+PASTES_DB = os.path.join(PASTES_DIR, "pastes.db")
+
+# Cache lifetime for paste responses (one year)
+PASTE_MAX_AGE = 31536000
+
+# In-process cache limits: total size per worker, and the largest single
+# entry worth caching (bigger pastes are read from SQLite every time)
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ITEM_BYTES = 256 * 1024
+
+# The connection is shared between request threads, so every query
+# goes through this lock
+_db_lock = threading.Lock()
+
+# Serialized paste_list response, rebuilt only when a paste is added
+# as a (key, payload) tuple so both are swapped in one assignment
+_list_cache = (None, b"")
+
+# Simple HTML template to display the paste, compiled once at import
+_VIEW_TPL = app.jinja_env.from_string("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{{ title }}</title>
+
+    <!-- Open Graph meta tags for link embedding -->
+    <meta property="og:title" content="{{ title }}" />
+    <meta property="og:description" content="{{ description }}" />
+    <meta property="og:url" content="{{ paste_url }}" />
+    <meta property="og:type" content="article" />
+    <meta property="og:site_name" content="Simple Paste" />
+
+    <!-- Twitter Card meta tags -->
+    <meta name="twitter:card" content="summary" />
+    <meta name="twitter:title" content="{{ title }}" />
+    <meta name="twitter:description" content="{{ description }}" />
+
+    <!-- Additional meta tags -->
+    <meta name="description" content="{{ description }}" />
+    <meta name="author" content="Paste Link" />
+
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .paste-container { max-width: 800px; margin: 0 auto; }
+        .paste-content { 
+            background: #f5f5f5; 
+            padding: 20px; 
+            border-radius: 5px; 
+            white-space: pre-wrap;
+            font-family: monospace;
+        }
+    </style>
+</head>
+<body>
+    <div class="paste-container">
+        <h1>{{ title }}</h1>
+        <div class="paste-meta">
+            Created: {{ created_at }}<br>
+            Paste ID: {{ paste_id }}
+        </div>
+        <div class="paste-content">{{ content }}</div>
+    </div>
+</body>
+</html>
+""")
+
+# Home page with the paste creation form
+_HOME_TPL = app.jinja_env.from_string("""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Simple Pastebin</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .container { max-width: 600px; margin: 0 auto; }
+        textarea { width: 100%; height: 200px; margin: 10px 0; }
+        input[type="text"] { width: 100%; margin: 10px 0; padding: 5px; }
+        button { background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 3px; cursor: pointer; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Simple Pastebin</h1>
+        <form action="/api/paste" method="post" enctype="application/x-www-form-urlencoded">
+            <input type="text" name="title" placeholder="Paste title (optional)">
+            <input type="text" name="description" placeholder="Paste description (optional)">
+            <textarea name="content" placeholder="Enter your content here..." required></textarea>
+            <button type="submit">Create Paste</button>
+        </form>
+    </div>
+</body>
+</html>
+""")
+
+def _base_url():
+    """Base URL for links to pastes, from BASE_URL or the request's Host"""
+    return app.config["BASE_URL"] or request.host_url.rstrip('/')
+
+def _json_response(data, status=200):
+    """Serialize data with orjson and wrap it in a JSON response"""
+    return Response(orjson.dumps(data), status=status, mimetype='application/json')
+
+@app.errorhandler(413)
+def _content_too_large(error):
+    """Answer bodies over MAX_CONTENT_LENGTH with JSON instead of an HTML page"""
+    return _json_response({"error": "Content too large"}, 413)
+
+def _cacheable(response, paste_id):
+    """Mark a paste response as immutable, keyed by the paste id"""
+    # Pastes never change after creation, so the id is a valid ETag
+    response.set_etag(paste_id)
+    response.cache_control.public = True
+    response.cache_control.max_age = PASTE_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+def _not_modified(paste_id):
+    """Return a 304 response if the client already has this paste, else None"""
+    if paste_id in request.if_none_match:
+        return _cacheable(Response(status=304), paste_id)
+    return None
+
 def generate_paste_id():
     """Generate a short unique ID for pastes"""
-    return str(uuid.uuid4())[:8]
+    # 6 random bytes encode to exactly 8 URL-safe characters
+    return secrets.token_urlsafe(6)
+
+def _write_file(path, payload):
+    """Write an already serialized payload to path with as few syscalls as possible"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            # One write for regular files; loop only in case of a short write
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# Columns added after the pastes table was first created, as (name, type);
+# they are nullable so rows written before them stay valid
+_ADDED_COLUMNS = [
+    ("content_html", "TEXT"),
+    ("meta_description", "TEXT"),
+    ("created_at_ns", "INTEGER"),
+]
+
+# Line breaks are flattened to spaces in meta tag descriptions
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+def init_db():
+    """Open the paste database, creating the schema if needed"""
+    conn = sqlite3.connect(PASTES_DB, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Serve page reads from a memory map instead of a read() per page
+    conn.execute("PRAGMA mmap_size=268435456")
+
+    # sqlite3 doesn't open a transaction for DDL on its own; take the write
+    # lock up front so workers starting together can't both add a column
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pastes (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(pastes)")}
+        for name, column_type in _ADDED_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE pastes ADD COLUMN {name} {column_type}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+    # user_version is only bumped once the import has committed, so a
+    # failed or interrupted import is retried on the next start
+    if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+        _import_json_pastes(conn)
+
+    # Rewrite legacy naive local timestamps so all rows share one format
+    if conn.execute("PRAGMA user_version").fetchone()[0] < 2:
+        _normalize_created_at(conn)
+
+    with conn:
+        # The list is sorted by the integer timestamp, not the ISO string
+        conn.execute("DROP INDEX IF EXISTS pastes_created_at")
+        conn.execute("CREATE INDEX IF NOT EXISTS pastes_created_at_ns ON pastes (created_at_ns)")
+
+    return conn
+
+def _normalize_created_at(conn):
+    """Give every row a created_at_ns and a created_at formatted from it"""
+    rows = conn.execute(
+        "SELECT id, created_at, created_at_ns FROM pastes "
+        "WHERE created_at_ns IS NULL OR created_at NOT LIKE '%+00:00'"
+    ).fetchall()
+
+    updates = []
+    for row in rows:
+        created_at_ns = row["created_at_ns"]
+        if created_at_ns is None:
+            # Older timestamps are naive local time, which is how fromisoformat reads them
+            created_at_ns = int(datetime.fromisoformat(row["created_at"]).timestamp() * 1e9)
+        updates.append((created_at_ns, _format_created_at(created_at_ns), row["id"]))
+
+    with conn:
+        conn.executemany(
+            "UPDATE pastes SET created_at_ns = ?, created_at = ? WHERE id = ?",
+            updates
+        )
+        conn.execute("PRAGMA user_version = 2")
+
+def _format_created_at(created_at_ns):
+    """Format a nanosecond epoch timestamp as an ISO 8601 UTC string"""
+    return datetime.fromtimestamp(created_at_ns / 1e9, timezone.utc).isoformat()
+
+def _legacy_paste_row(paste_data):
+    """Turn a parsed <id>.json paste into a pastes row, or None if unusable"""
+    if not isinstance(paste_data, dict):
+        return None
+
+    paste_id = paste_data.get("id")
+    content = paste_data.get("content")
+    created_at = paste_data.get("created_at")
+    if not isinstance(paste_id, str) or content is None or not isinstance(created_at, str):
+        return None
+
+    try:
+        datetime.fromisoformat(created_at)
+    except ValueError:
+        return None
+
+    # The old storage accepted any JSON value here, so stringify the rest.
+    # Lone surrogates (which json.dump wrote as \ud800-style escapes) can't
+    # be stored in SQLite, so they become U+FFFD
+    def as_text(value):
+        if not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        return value.encode('utf-16-le', 'surrogatepass').decode('utf-16-le', 'replace')
+
+    return {
+        "id": as_text(paste_id),
+        "title": as_text(paste_data.get("title") or f"Paste {paste_id}"),
+        "description": as_text(paste_data.get("description") or ""),
+        "content": as_text(content),
+        "created_at": created_at
+    }
+
+def _import_json_pastes(conn):
+    """Copy pastes stored as <id>.json files into the database"""
+    rows = []
+    for filename in os.listdir(PASTES_DIR):
+        if filename.endswith('.json'):
+            try:
+                with open(os.path.join(PASTES_DIR, filename), 'rb') as f:
+                    data = f.read()
+                try:
+                    paste_data = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    # orjson rejects the lone surrogate escapes json.dump may have written
+                    paste_data = json.loads(data)
+                row = _legacy_paste_row(paste_data)
+            except (OSError, ValueError):
+                row = None
+
+            if row is None:
+                app.logger.warning("Skipping unreadable legacy paste %s", filename)
+                continue
+            rows.append(row)
+
+    # OR IGNORE since another worker may be importing the same files
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO pastes (id, title, description, content, created_at) "
+            "VALUES (:id, :title, :description, :content, :created_at)",
+            rows
+        )
+        conn.execute("PRAGMA user_version = 1")
+
+def _meta_description(content, description=None):
+    """Build the meta tag description, falling back to a content preview"""
+    if description:
+        return description
+
+    # Create description from content (first 150 characters)
+    preview = content[:150] + "..." if len(content) > 150 else content
+    return preview.translate(_NL_TABLE)
+
+def _raw_filename(paste_id):
+    """Path of a paste's raw sidecar, relative to PASTES_DIR"""
+    # Bucketed by the first two id characters to keep directories small
+    return os.path.join(paste_id[:2], f"{paste_id}.txt")
+
+def _write_raw(paste_id, content):
+    """Write the raw content sidecar for a paste"""
+    filepath = os.path.join(PASTES_DIR, _raw_filename(paste_id))
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    # Written to a temp file and renamed into place, so the raw view (which
+    # serves any sidecar that exists) never sees a partial file
+    tmp_path = f"{filepath}.{secrets.token_hex(4)}.tmp"
+    try:
+        _write_file(tmp_path, content.encode())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
 def save_paste(paste_id, content, title=None, description=None):
-    """Save paste content to file"""
+    """Save paste content to the database"""
+    created_at_ns = time.time_ns()
     paste_data = {
         "id": paste_id,
         "content": content,
         "title": title or f"Paste {paste_id}",
         "description": description or "",
-        "created_at": datetime.now().isoformat()
+        "created_at": _format_created_at(created_at_ns),
+        "created_at_ns": created_at_ns,
+        # Escaped once here so views don't rescan the content on every render
+        "content_html": str(escape(content)),
+        "meta_description": _meta_description(content, description)
     }
 
-    filepath = os.path.join(PASTES_DIR, f"{paste_id}.json")
-    with open(filepath, 'w') as f:
-        json.dump(paste_data, f)
+    with _db_lock, _db:
+        _db.execute(
+            "INSERT INTO pastes "
+            "(id, title, description, content, created_at, created_at_ns, content_html, meta_description) "
+            "VALUES (:id, :title, :description, :content, :created_at, :created_at_ns, "
+            ":content_html, :meta_description)",
+            paste_data
+        )
+
+    # Raw content sidecar so /<id>/raw can be sent straight from disk; only
+    # written once the row is committed, so a failed insert leaves no file
+    # behind (and a missing one is rebuilt from the row by the raw view)
+    _write_raw(paste_id, content)
 
     return paste_data
 
+class _SizedLRU:
+    """LRU cache bounded by the total size of its values rather than their count"""
+
+    def __init__(self, max_bytes, max_item_bytes):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            self._items.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Cache value under key unless it alone is larger than max_item_bytes"""
+        if size > self.max_item_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+
+# Parsed paste rows, cached since pastes never change
+_paste_cache = _SizedLRU(CACHE_MAX_BYTES, CACHE_MAX_ITEM_BYTES)
+
 def load_paste(paste_id):
-    """Load paste content from file"""
-    filepath = os.path.join(PASTES_DIR, f"{paste_id}.json")
-    if not os.path.exists(filepath):
+    """Load paste content from the database"""
+    paste_data = _paste_cache.get(paste_id)
+    if paste_data is not None:
+        return paste_data
+
+    with _db_lock:
+        row = _db.execute(
+            "SELECT id, title, description, content, created_at, meta_description "
+            "FROM pastes WHERE id = ?",
+            (paste_id,)
+        ).fetchone()
+
+    # Missing pastes aren't cached, so one created later (e.g. by another
+    # worker) is still found
+    if row is None:
         return None
 
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    paste_data = dict(row)
+    size = sum(sys.getsizeof(value) for value in paste_data.values())
+    _paste_cache.put(paste_id, paste_data, size)
+    return paste_data
+
+@lru_cache(maxsize=65536)
+def _check_paste_exists(paste_id):
+    """Look up a paste id without loading the row, cached for known ids"""
+    with _db_lock:
+        row = _db.execute("SELECT 1 FROM pastes WHERE id = ?", (paste_id,)).fetchone()
+
+    # Raise instead of returning False so that lru_cache doesn't remember misses
+    if row is None:
+        raise KeyError(paste_id)
+
+def paste_exists(paste_id):
+    """Check whether a paste exists"""
+    try:
+        _check_paste_exists(paste_id)
+        return True
+    except KeyError:
+        return False
 
 @app.route('/api/paste/<paste_id>', methods=['GET'])
 def pastebin_get(paste_id):
@@ -45,10 +464,14 @@ def pastebin_get(paste_id):
     paste_data = load_paste(paste_id)
     
     if not paste_data:
-        return jsonify({"error": "Paste not found"}), 404
+        return _json_response({"error": "Paste not found"}, 404)
+
+    not_modified = _not_modified(paste_id)
+    if not_modified:
+        return not_modified
     
-    # Get the base URL from the request
-    base_url = request.host_url.rstrip('/')
+    # Get the base URL of the deployment
+    base_url = _base_url()
     paste_url = f"{base_url}/{paste_id}"
     raw_url = f"{base_url}/{paste_id}/raw"
     
@@ -63,39 +486,72 @@ def pastebin_get(paste_id):
         "raw_url": raw_url
     }
     
-    return jsonify(response_data)
+    return _cacheable(_json_response(response_data), paste_id)
 
-@app.route('/api/paste', methods=['GET', 'POST'])
-def pastebin_create():
-    """Create a new paste"""
+def _extract_paste_fields(is_form):
+    """Read content, title and description from the query string, JSON body or form
+
+    Returns None when the JSON body is not an object.
+    """
     # Handle GET requests with query parameters
     if request.method == 'GET':
-        content = request.args.get('content') or request.args.get('prompt')
-        title = request.args.get('title')
-        description = request.args.get('description')
+        src = request.args
+        return src.get('content') or src.get('prompt'), src.get('title'), src.get('description')
+
     # Handle both JSON and form data for POST
-    elif request.is_json:
-        data = request.get_json() or {}
-        content = request.args.get('prompt') or data.get('content') or data.get('prompt')
-        title = data.get('title')
-        description = data.get('description')
-    else:
-        # Handle form data
-        content = request.args.get('prompt') or request.form.get('content') or request.form.get('prompt')
-        title = request.form.get('title')
-        description = request.form.get('description')
+    src = request.form if is_form else (request.get_json() or {})
+    if not is_form and not isinstance(src, dict):
+        # JSON body that isn't an object
+        return None
+
+    # A ?prompt= query parameter overrides the body; skip parsing the
+    # query string when there isn't one
+    prompt = request.args.get('prompt') if request.query_string else None
+    content = prompt or src.get('content') or src.get('prompt')
+    return content, src.get('title'), src.get('description')
+
+@app.route('/api/paste', methods=['GET', 'POST'])
+def pastebin_create():
+    """Create a new paste"""
+    is_form = request.method == 'POST' and not request.is_json
+    fields = _extract_paste_fields(is_form)
+    if fields is None:
+        return _json_response({"error": "JSON body must be an object"}, 400)
+    content, title, description = fields
 
     if not content:
-        return jsonify({"error": "No content provided"}), 400
+        return _json_response({"error": "No content provided"}, 400)
+
+    # JSON bodies can carry any type; empty values just fall back to defaults
+    if any(value and not isinstance(value, str) for value in fields):
+        return _json_response({"error": "content, title and description must be strings"}, 400)
+
+    # Lone surrogates (e.g. "\ud800" in a JSON body) can't be encoded for
+    # the raw sidecar or SQLite; reject them before anything is written
+    try:
+        for value in fields:
+            if value:
+                value.encode()
+    except UnicodeEncodeError:
+        return _json_response({"error": "content, title and description must be valid Unicode"}, 400)
+
+    # Also covers GET query strings, which MAX_CONTENT_LENGTH doesn't limit;
+    # measured in UTF-8 bytes, like MAX_CONTENT_LENGTH
+    if len(content.encode()) > MAX_PASTE_SIZE:
+        return _json_response({"error": "Content too large"}, 413)
 
     paste_id = generate_paste_id()
     paste_data = save_paste(paste_id, content, title, description)
 
-    # Get the base URL from the request
-    base_url = request.host_url.rstrip('/')
+    # Get the base URL of the deployment
+    base_url = _base_url()
     paste_url = f"{base_url}/{paste_id}"
     raw_url = f"{base_url}/{paste_id}/raw"
 
+    # If it's a POST form submission (not GET with query params), redirect to the paste URL
+    if is_form:
+        return redirect(paste_url)
+
     response_data = {
         "success": True,
         "paste_id": paste_id,
@@ -106,148 +562,132 @@ def pastebin_create():
         "created_at": paste_data["created_at"]
     }
 
-    # If it's a POST form submission (not GET with query params), redirect to the paste URL
-    if request.method == 'POST' and not request.is_json:
-        from flask import redirect
-        return redirect(paste_url)
-
-    return jsonify(response_data)
+    return _json_response(response_data)
 
 @app.route('/<paste_id>/raw')
 def view_paste_raw(paste_id):
     """View raw paste content"""
-    paste_data = load_paste(paste_id)
+    filename = _raw_filename(paste_id)
+    if not os.path.exists(os.path.join(PASTES_DIR, filename)):
+        paste_data = load_paste(paste_id)
+
+        if not paste_data:
+            return "Paste not found", 404
+
+        # Pastes imported from JSON files or saved before sidecars were
+        # bucketed have none at this path yet; write it once and stream it
+        # like any other paste
+        _write_raw(paste_id, paste_data["content"])
+
+    # Sent straight from disk (sendfile where available, or by the front-end
+    # server with USE_X_SENDFILE) instead of holding the content in memory
+    response = send_from_directory(
+        PASTES_DIR, filename, mimetype='text/plain', conditional=True,
+        etag=paste_id, max_age=PASTE_MAX_AGE
+    )
+    return _cacheable(response, paste_id)
 
-    if not paste_data:
-        return "Paste not found", 404
+# Rendered pages, cached without the paste URL (which comes from the
+# request's Host when BASE_URL is unset) so each paste has one entry
+_page_cache = _SizedLRU(CACHE_MAX_BYTES, CACHE_MAX_ITEM_BYTES)
 
-    # Return plain text content
-    from flask import Response
-    return Response(paste_data["content"], mimetype='text/plain')
+# Stand-in for the paste URL in cached pages; random so paste text can't forge it
+_URL_SLOT = secrets.token_hex(16)
 
-@app.route('/<paste_id>')
-def view_paste(paste_id):
-    """View a paste by its ID"""
+def _render_paste_html(paste_id):
+    """Render the HTML page for an existing paste, split around its URL"""
     paste_data = load_paste(paste_id)
 
-    if not paste_data:
-        return "Paste not found", 404
-
-    # Simple HTML template to display the paste
-    template = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{{ title }}</title>
-
-        <!-- Open Graph meta tags for link embedding -->
-        <meta property="og:title" content="{{ title }}" />
-        <meta property="og:description" content="{{ description }}" />
-        <meta property="og:url" content="{{ paste_url }}" />
-        <meta property="og:type" content="article" />
-        <meta property="og:site_name" content="Simple Paste" />
-
-        <!-- Twitter Card meta tags -->
-        <meta name="twitter:card" content="summary" />
-        <meta name="twitter:title" content="{{ title }}" />
-        <meta name="twitter:description" content="{{ description }}" />
-
-        <!-- Additional meta tags -->
-        <meta name="description" content="{{ description }}" />
-        <meta name="author" content="Paste Link" />
-
-        <style>
-            body { font-family: Arial, sans-serif; margin: 40px; }
-            .paste-container { max-width: 800px; margin: 0 auto; }
-            .paste-content { 
-                background: #f5f5f5; 
-                padding: 20px; 
-                border-radius: 5px; 
-                white-space: pre-wrap;
-                font-family: monospace;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="paste-container">
-            <h1>{{ title }}</h1>
-            <div class="paste-meta">
-                Created: {{ created_at }}<br>
-                Paste ID: {{ paste_id }}
-            </div>
-            <div class="paste-content">{{ content }}</div>
-        </div>
-    </body>
-    </html>
-    """
+    # Pastes saved before meta_description existed build it here instead
+    description = paste_data["meta_description"]
+    if description is None:
+        description = _meta_description(paste_data["content"], paste_data["description"])
 
-    description = paste_data.get("description")
-    if not description:
-        # Create description from content (first 150 characters)
-        description = paste_data["content"][:150] + "..." if len(paste_data["content"]) > 150 else paste_data["content"]
-        description = description.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks for meta tags
+    # Read only here rather than kept in the paste cache, since it is
+    # a second (escaped) copy of the content that API and raw views never use
+    with _db_lock:
+        content_html = _db.execute(
+            "SELECT content_html FROM pastes WHERE id = ?", (paste_id,)
+        ).fetchone()[0]
 
-    # Get current paste URL
-    paste_url = f"{request.host_url.rstrip('/')}/{paste_id}"
+    # Pastes saved before content_html existed are escaped here instead
+    content = Markup(content_html) if content_html is not None else paste_data["content"]
 
-    return render_template_string(
-        template,
+    html = _VIEW_TPL.render(
         title=paste_data["title"],
-        content=paste_data["content"],
+        content=content,
         description=description,
-        paste_url=paste_url,
+        paste_url=Markup(_URL_SLOT),
         created_at=paste_data["created_at"],
         paste_id=paste_data["id"]
-    )
+    ).encode()
+
+    before, after = html.split(_URL_SLOT.encode(), 1)
+    return before, after
+
+def _paste_page(paste_id, paste_url):
+    """Build the HTML page for an existing paste, reusing the cached render"""
+    parts = _page_cache.get(paste_id)
+    if parts is None:
+        parts = _render_paste_html(paste_id)
+        _page_cache.put(paste_id, parts, len(parts[0]) + len(parts[1]))
+
+    before, after = parts
+    return before + str(escape(paste_url)).encode() + after
+
+@app.route('/<paste_id>')
+def view_paste(paste_id):
+    """View a paste by its ID"""
+    # Check existence first so missing pastes never reach the render cache
+    if not paste_exists(paste_id):
+        return "Paste not found", 404
+
+    not_modified = _not_modified(paste_id)
+    if not_modified:
+        return not_modified
+
+    html = _paste_page(paste_id, f"{_base_url()}/{paste_id}")
+    return _cacheable(Response(html, mimetype='text/html'), paste_id)
 
 @app.route('/api/paste_list')
 def pastebin_list():
     """List all pastes"""
-    pastes = []
-    for filename in os.listdir(PASTES_DIR):
-        if filename.endswith('.json'):
-            paste_id = filename[:-5]  # Remove .json extension
-            paste_data = load_paste(paste_id)
-            if paste_data:
-                pastes.append({
-                    "id": paste_data["id"],
-                    "title": paste_data["title"],
-                    "created_at": paste_data["created_at"],
-                    "url": f"{request.host_url.rstrip('/')}/{paste_data['id']}"
-                })
-
-    return jsonify({"pastes": sorted(pastes, key=lambda x: x["created_at"], reverse=True)})
+    global _list_cache
+    base_url = _base_url()
+    with _db_lock:
+        # Pastes are only ever inserted, so the highest rowid changes
+        # exactly when the list does, including inserts by other workers
+        last_rowid = _db.execute("SELECT MAX(rowid) FROM pastes").fetchone()[0]
+    key = (last_rowid, base_url)
+
+    cached_key, payload = _list_cache
+    if cached_key != key:
+        with _db_lock:
+            rows = _db.execute(
+                "SELECT id, title, created_at FROM pastes ORDER BY created_at_ns DESC"
+            ).fetchall()
+
+        pastes = [{
+            "id": row["id"],
+            "title": row["title"],
+            "created_at": row["created_at"],
+            "url": f"{base_url}/{row['id']}"
+        } for row in rows]
+
+        payload = orjson.dumps({"pastes": pastes})
+        _list_cache = (key, payload)
+
+    return Response(payload, mimetype='application/json')
 
 @app.route('/')
 def home():
     """Simple home page with paste creation form"""
-    template = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Simple Pastebin</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 40px; }
-            .container { max-width: 600px; margin: 0 auto; }
-            textarea { width: 100%; height: 200px; margin: 10px 0; }
-            input[type="text"] { width: 100%; margin: 10px 0; padding: 5px; }
-            button { background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 3px; cursor: pointer; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Simple Pastebin</h1>
-            <form action="/api/paste" method="post" enctype="application/x-www-form-urlencoded">
-                <input type="text" name="title" placeholder="Paste title (optional)">
-                <input type="text" name="description" placeholder="Paste description (optional)">
-                <textarea name="content" placeholder="Enter your content here..." required></textarea>
-                <button type="submit">Create Paste</button>
-            </form>
-        </div>
-    </body>
-    </html>
-    """
-    return render_template_string(template)
+    return _HOME_TPL.render()
+
+_db = init_db()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Multi-threaded production server instead of the Werkzeug debug server;
+    # for multiple processes run e.g. `gunicorn -w 4 -k gthread --threads 8 main:app`
+    from waitress import serve
+    serve(app, host='0.0.0.0', port=5000, threads=16)